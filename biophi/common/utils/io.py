@@ -11,6 +11,7 @@ from abnumber import Chain as AbNumberChain, ChainParseError
 from flask import send_file, request, flash, current_app
 from dataclasses import dataclass
 from werkzeug.datastructures import FileStorage
+import numpy as np
 import pandas as pd
 from werkzeug.utils import redirect
 
@@ -415,20 +416,19 @@ def write_sheet(df, writer, sheet_name='Sheet1', index=True, **kwargs):
     """
     Write df as an excel file to ExcelWriter, roughly similar to `df.to_excel` except that it handles
     `df` with MultiIndex columns and `index=False`.
+
+    Headers are written before the data. If the workbook is in `constant_memory` mode, where rows need to be written
+    in order, data is written row by row instead of using `df.to_excel`, which writes column by column. Extra
+    `df.to_excel` kwargs are not supported in that mode.
     """
+    if writer.book.constant_memory and kwargs:
+        raise ValueError(f'Extra to_excel arguments are not supported in constant_memory mode: {", ".join(kwargs)}')
 
-    # Avoid the "NotImplementedError: Writing to Excel with MultiIndex columns"
-    # exception by temporarily changing the columns to a single-level index
     columns: pd.Index = df.columns
-    df.columns = range(len(df.columns))
-    df.to_excel(
-        writer, startrow=columns.nlevels, header=False, sheet_name=sheet_name, index=index, **kwargs
-    )
-    df.columns = columns
 
     # Get the xlsxwriter workbook and worksheet objects.
     book = writer.book
-    sheet = writer.sheets[sheet_name]
+    sheet = book.get_worksheet_by_name(sheet_name) or book.add_worksheet(sheet_name)
 
     # Add a header format.
     header_format = book.add_format({
@@ -456,12 +456,47 @@ def write_sheet(df, writer, sheet_name='Sheet1', index=True, **kwargs):
 
     if index and any(df.index.names):
         for i, name in enumerate(df.index.names):
-            sheet.write(df.columns.nlevels-1, i, name or '', header_format)
-            sheet.write(df.columns.nlevels-1, i, name or '', header_format)
+            sheet.write(columns.nlevels-1, i, name or '', header_format)
 
+    if book.constant_memory:
+        for i, (index_value, row) in enumerate(zip(df.index, df.itertuples(index=False, name=None))):
+            values = list(index_value if isinstance(index_value, tuple) else [index_value]) if index else []
+            values += row
+            sheet.write_row(columns.nlevels + i, 0, [get_excel_value(value) for value in values])
+        return
 
-def write_sheets(df_dict: Dict[str, pd.DataFrame], fd_or_path):
-    writer = pd.ExcelWriter(fd_or_path, engine='xlsxwriter')
+    # Avoid the "NotImplementedError: Writing to Excel with MultiIndex columns"
+    # exception by temporarily changing the columns to a single-level index
+    df.columns = range(len(df.columns))
+    try:
+        df.to_excel(
+            writer, startrow=columns.nlevels, header=False, sheet_name=sheet_name, index=index, **kwargs
+        )
+    finally:
+        df.columns = columns
+
+
+def get_excel_value(value):
+    """Convert value to a type supported by xlsxwriter, None for missing values (written as empty cell)"""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def write_sheets(df_dict: Dict[str, pd.DataFrame], fd_or_path, constant_memory=False):
+    """Write dict of dataframes as sheets of an XLSX file
+
+    With constant_memory, rows are flushed to disk as they are written instead of keeping the whole workbook in memory,
+    but cells are not formatted by pandas (index values are written as plain cells).
+    """
+    engine_kwargs = {'options': {'constant_memory': True}} if constant_memory else {}
+    writer = pd.ExcelWriter(fd_or_path, engine='xlsxwriter', engine_kwargs=engine_kwargs)
 
     sheet_names = shorten_sheet_names([sanitize_excel_sheet_name(n) for n in df_dict.keys()])
     for sheet_name, df in zip(sheet_names, df_dict.values()):
@@ -6,8 +6,9 @@ import itertools
 import subprocess
 import numpy as np
 from io import StringIO
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 from Bio import SeqIO
+from Bio.SeqIO.FastaIO import SimpleFastaParser
 from abnumber import Chain
 import re
 
@@ -83,6 +84,21 @@ def iterate_fasta(paths, limit=None, random=False, random_sample_from_limit=None
             yield record
 
 
+def iterate_fasta_tuples(paths) -> Iterator[Tuple[str, str]]:
+    """
+    Iterate through fasta sequence file(s), return generator of (id, sequence) string tuples
+
+    Faster than iterate_fasta, no SeqRecord objects are created.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    for path in paths:
+        with open(path) as handle:
+            for title, seq in SimpleFastaParser(handle):
+                # Same as SeqRecord.id, first word of the title
+                yield (title.split(None, 1)[0] if title else ''), seq
+
+
 def download_pdb(pdb_id):
     return urllib.request.urlopen(f'https://files.rcsb.org/download/{pdb_id.strip()}.pdb').read()
 
@@ -109,6 +125,26 @@ def looks_like_dna(seq):
     return DNA_SEQ_REGEX.fullmatch(str(seq))
 
 
+# Conserved cysteines of the variable domain (IMGT 23 and 104) are roughly 70 residues apart
+V_DOMAIN_MIN_LENGTH = 80
+V_DOMAIN_CYSTEINE_DISTANCE_RANGE = (50, 90)
+
+
+def looks_like_antibody_v_domain(seq):
+    """Return False if sequence is clearly not an antibody variable domain, used to skip the expensive numbering
+
+    Rejects nucleotide sequences, short fragments and sequences without the pair of conserved cysteines.
+    Sequences can include a constant region, so there is no upper limit on the length.
+    """
+    seq = str(seq).upper()
+    if len(seq) < V_DOMAIN_MIN_LENGTH or looks_like_dna(seq):
+        return False
+    min_distance, max_distance = V_DOMAIN_CYSTEINE_DISTANCE_RANGE
+    cysteines = [i for i, aa in enumerate(seq) if aa == 'C']
+    return any(min_distance <= end - start <= max_distance
+               for i, start in enumerate(cysteines) for end in cysteines[i+1:])
+
+
 # B Asn or Asp
 # Z Gln or Glu
 # J Leu or Ile
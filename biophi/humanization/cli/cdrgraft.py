@@ -1,24 +1,38 @@
+import itertools
+from collections import deque
 from functools import partial
 from multiprocessing import Pool
 
 import click
-from Bio import SeqIO
+import numpy as np
 import pandas as pd
 from biophi.common.utils.formatting import logo
-from biophi.common.utils.io import parse_antibody_files, write_sheets
-from biophi.common.utils.seq import iterate_fasta
-from biophi.humanization.cli.oasis import show_unpaired_warning
-from biophi.humanization.methods.humanness import OASisParams, get_antibody_humanness
+from biophi.common.utils.io import write_sheets, chunk_list
+from biophi.common.utils.seq import iterate_fasta_tuples, looks_like_antibody_v_domain, parse_plaintext_records
+from biophi.humanization.methods.humanness import OASisParams, get_antibody_humanness, get_antibody_humanness_batch, \
+    get_oasis_engine, get_num_total_oas_subjects
 from biophi.humanization.methods.humanization import (
     humanize_antibody, 
+    humanize_antibody_auto,
     CDRGraftingHumanizationParams, 
     HumanizationParams
 )
 from abnumber import Chain, ChainParseError, SUPPORTED_CDR_DEFINITIONS, SUPPORTED_SCHEMES
 import os
 import sys
+from typing import List, Tuple
 from tqdm import tqdm
 
+# Number of records humanized in a single worker task (OASis DB is searched once per task)
+RECORDS_PER_JOB = 16
+# Heavy and light chain sequences numbered in each worker on startup
+WARMUP_SEQS = [
+    'QVQLVQSGVEVKKPGASVKVSCKASGYTFTNYYMYWVRQAPGQGLEWMGGINPSNGGTNFNEKFKNRVTLTTDSSTTTAYMELKSLQFDDTAVYYCARRDYRFDMGFDYWGQGTTVTVSS',
+    'DIQMTQSPSSLSASVGDRVTITCRASQSISSYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGSGSGTDFTLTISSLQPEDFATYYCQQSYSTPLTFGQGTKVEIK'
+]
+# Line width of sequences in output FASTA files (same as Bio.SeqIO)
+FASTA_LINE_LENGTH = 60
+
 
 @click.command()
 @click.argument('inputs', required=False, nargs=-1)
@@ -32,8 +46,9 @@ from tqdm import tqdm
 @click.option('--backmutate-vernier/--no-backmutate-vernier', default=False, type=bool, help='Backmutate Vernier zone residues to parental (default: disabled)')
 @click.option('--sapiens-iterations', type=int, default=0, help='Additional Sapiens iterations after CDR grafting')
 @click.option('--limit', required=False, metavar='N', type=int, help='Process only first N records')
+@click.option('--jobs', type=int, default=os.cpu_count(), help='Number of parallel worker processes (default: number of CPUs)')
 def cdrgraft(inputs, output, fasta_only, scheme, cdr_definition, heavy_v_germline, light_v_germline, 
-             backmutate_vernier, sapiens_iterations, limit, oasis_db):
+             backmutate_vernier, sapiens_iterations, limit, jobs, oasis_db):
     """CDR Grafting: Humanize antibodies by grafting CDRs onto human germline frameworks.
 
     CDR Grafting transplants the CDR loops from the input antibody onto the most similar
@@ -80,6 +95,11 @@ def cdrgraft(inputs, output, fasta_only, scheme, cdr_definition, heavy_v_germlin
         click.echo(f'- Sapiens refinement iterations: {sapiens_iterations}', err=True)
     click.echo(f'', err=True)
 
+    if scheme not in SUPPORTED_SCHEMES:
+        raise ValueError(f'Unsupported numbering scheme "{scheme}", use one of: {", ".join(SUPPORTED_SCHEMES)}')
+    if cdr_definition not in SUPPORTED_CDR_DEFINITIONS:
+        raise ValueError(f'Unsupported CDR definition "{cdr_definition}", use one of: {", ".join(SUPPORTED_CDR_DEFINITIONS)}')
+
     humanization_params = CDRGraftingHumanizationParams(
         scheme=scheme,
         cdr_definition=cdr_definition,
@@ -100,7 +120,8 @@ def cdrgraft(inputs, output, fasta_only, scheme, cdr_definition, heavy_v_germlin
                 inputs,
                 output,
                 humanization_params=humanization_params,
-                limit=limit
+                limit=limit,
+                jobs=jobs
             )
         else:
             return cdrgraft_full_report(
@@ -108,7 +129,8 @@ def cdrgraft(inputs, output, fasta_only, scheme, cdr_definition, heavy_v_germlin
                 output,
                 humanization_params=humanization_params,
                 oasis_params=oasis_params,
-                limit=limit
+                limit=limit,
+                jobs=jobs
             )
     else:
         # Interactive mode
@@ -118,157 +140,61 @@ def cdrgraft(inputs, output, fasta_only, scheme, cdr_definition, heavy_v_germlin
         )
 
 
-def cdrgraft_fasta_only(inputs, output, humanization_params, limit=None):
+def cdrgraft_fasta_only(inputs, output, humanization_params, limit=None, jobs=None):
     """Process FASTA files and output only humanized sequences."""
     click.echo('Reading input files...', err=True)
-    records = list(iterate_fasta(inputs))
+    records = iterate_fasta_tuples(inputs)
     
     if limit:
-        records = records[:limit]
-    
-    click.echo(f'Processing {len(records)} sequences...', err=True)
-    
-    humanized_records = []
-    
-    for record in tqdm(records, desc='Humanizing', file=sys.stderr):
-        try:
-            chain = Chain(str(record.seq), scheme=humanization_params.scheme, cdr_definition=humanization_params.cdr_definition)
-            chain.name = record.id
-            
-            # Determine if heavy or light chain
-            if chain.is_heavy_chain():
-                result = humanize_antibody(vh=chain, vl=None, params=humanization_params)
-                humanized_chain = result.vh.humanized_chain if result.vh else None
-            else:
-                result = humanize_antibody(vh=None, vl=chain, params=humanization_params)
-                humanized_chain = result.vl.humanized_chain if result.vl else None
-            
-            if humanized_chain:
-                # Create description
-                chain_type = 'VH' if humanized_chain.is_heavy_chain() else 'VL'
-                method_desc = f'CDR_Grafted_{humanization_params.cdr_definition}_'
-                if humanization_params.backmutate_vernier:
-                    method_desc += 'Vernier_'
-                if humanization_params.sapiens_iterations > 0:
-                    method_desc += f'Sapiens_{humanization_params.sapiens_iterations}iter_'
-                
-                germline = humanized_chain.v_gene if hasattr(humanized_chain, 'v_gene') else 'auto'
-                description = f'{record.id} {chain_type} (Humanized {record.id} {method_desc}{germline} BioPhi)'
-                
-                from Bio.SeqRecord import SeqRecord
-                humanized_record = SeqRecord(
-                    seq=humanized_chain.seq,
-                    id=record.id,
-                    description=description
-                )
-                humanized_records.append(humanized_record)
-        
-        except ChainParseError as e:
-            click.echo(f'Warning: Could not parse {record.id}: {e}', err=True)
-            continue
-        except Exception as e:
-            click.echo(f'Error processing {record.id}: {e}', err=True)
-            continue
-    
-    # Output results
+        records = itertools.islice(records, limit)
+
+    num_humanized = 0
     if output:
         click.echo(f'Writing output to {output}...', err=True)
-        with open(output, 'w') as f:
-            SeqIO.write(humanized_records, f, 'fasta')
+        f = open(output, 'w')
     else:
         # Print to stdout
-        SeqIO.write(humanized_records, sys.stdout, 'fasta')
+        f = sys.stdout
+
+    try:
+        for res in _iterate_results(records, humanization_params=humanization_params, fasta_only=True, jobs=jobs):
+            num_humanized += _write_fasta(res['humanized_records'], f)
+    finally:
+        if output:
+            f.close()
     
-    click.echo(f'Completed: {len(humanized_records)} sequences humanized', err=True)
+    click.echo(f'Completed: {num_humanized} sequences humanized', err=True)
 
 
-def cdrgraft_full_report(inputs, output, humanization_params, oasis_params=None, limit=None):
+def cdrgraft_full_report(inputs, output, humanization_params, oasis_params=None, limit=None, jobs=None):
     """Process FASTA files and generate full report with OASis analysis."""
     click.echo('Reading input files...', err=True)
     
     # Read FASTA records
-    records = list(iterate_fasta(inputs))
+    records = iterate_fasta_tuples(inputs)
     
     if limit:
-        records = records[:limit]
-    
-    if not records:
+        records = itertools.islice(records, limit)
+
+    # Check for empty input before creating any output, without reading the remaining records
+    first_record = next(records, None)
+    if first_record is None:
         click.echo('No valid sequences found!', err=True)
         return
-    
-    click.echo(f'Processing {len(records)} sequences...', err=True)
-    
-    results = []
-    humanized_records = []
-    
-    for record in tqdm(records, desc='Humanizing', file=sys.stderr):
-        try:
-            chain = Chain(str(record.seq), scheme=humanization_params.scheme, cdr_definition=humanization_params.cdr_definition)
-            chain.name = record.id
-            
-            # Determine if heavy or light chain
-            if chain.is_heavy_chain():
-                vh_chain = chain
-                vl_chain = None
-                result = humanize_antibody(vh=vh_chain, vl=None, params=humanization_params)
-            else:
-                vh_chain = None
-                vl_chain = chain
-                result = humanize_antibody(vh=None, vl=vl_chain, params=humanization_params)
-            
-            # Get humanness scores if OASis DB is available
-            parental_humanness = None
-            humanized_humanness = None
-            
-            if oasis_params:
-                try:
-                    parental_humanness = get_antibody_humanness(
-                        vh=vh_chain,
-                        vl=vl_chain,
-                        params=oasis_params
-                    )
-                    humanized_humanness = get_antibody_humanness(
-                        vh=result.vh.humanized_chain if result.vh else None,
-                        vl=result.vl.humanized_chain if result.vl else None,
-                        params=oasis_params
-                    )
-                except Exception as e:
-                    click.echo(f'Warning: Could not compute OASis scores for {record.id}: {e}', err=True)
-            
-            # Store result
-            results.append({
-                'name': record.id,
-                'humanization': result,
-                'parental_humanness': parental_humanness,
-                'humanized_humanness': humanized_humanness
-            })
-            
-            # Create FASTA records
-            for chain_result in [result.vh, result.vl]:
-                if chain_result:
-                    humanized_chain = chain_result.humanized_chain
-                    chain_type = 'VH' if humanized_chain.is_heavy_chain() else 'VL'
-                    
-                    method_desc = humanization_params.get_export_name()
-                    description = f'{record.id} {chain_type} (Humanized {record.id} {method_desc}BioPhi)'
-                    
-                    from Bio.SeqRecord import SeqRecord
-                    humanized_record = SeqRecord(
-                        seq=humanized_chain.seq,
-                        id=f'{record.id}_{chain_type}',
-                        description=description
-                    )
-                    humanized_records.append(humanized_record)
-        
-        except Exception as e:
-            click.echo(f'Error processing {record.id}: {e}', err=True)
-            continue
+    records = itertools.chain([first_record], records)
+
+    num_results = 0
     
     # Output results
     if not output:
-        # Print to stdout
-        SeqIO.write(humanized_records, sys.stdout, 'fasta')
+        # Print to stdout as results arrive, without keeping them
+        for res in _iterate_results(records, humanization_params=humanization_params, oasis_params=oasis_params, jobs=jobs):
+            num_results += 1
+            _write_fasta(res['humanized_records'], sys.stdout)
     else:
+        # Results are kept for the alignments and the report
+        results = []
+
         # Create output directory
         os.makedirs(output, exist_ok=True)
         
@@ -276,7 +202,11 @@ def cdrgraft_full_report(inputs, output, humanization_params, oasis_params=None,
         fasta_path = os.path.join(output, 'humanized.fa')
         click.echo(f'Writing humanized sequences to {fasta_path}...', err=True)
         with open(fasta_path, 'w') as f:
-            SeqIO.write(humanized_records, f, 'fasta')
+            for res in _iterate_results(records, humanization_params=humanization_params, oasis_params=oasis_params,
+                                        report=True, jobs=jobs):
+                results.append(res)
+                _write_fasta(res['humanized_records'], f)
+        num_results = len(results)
         
         # Write alignments file
         if results:
@@ -294,57 +224,261 @@ def cdrgraft_full_report(inputs, output, humanization_params, oasis_params=None,
             sheets = {}
             
             # Overview sheet
-            overview_data = []
-            for res in results:
-                row = {'Antibody': res['name']}
-                
+            min_frac = oasis_params.min_fraction_subjects
+            oasis_identity = np.full(num_results, np.nan)
+            oasis_percentile = np.full(num_results, np.nan)
+            heavy_oasis_identity = np.full(num_results, np.nan)
+            light_oasis_identity = np.full(num_results, np.nan)
+            num_mutations = np.zeros(num_results, dtype=int)
+            for i, res in enumerate(results):
+                # Counted by the workers, this only copies the value
+                num_mutations[i] = res['num_mutations']
                 if res['humanized_humanness']:
-                    hum = res['humanized_humanness']
-                    min_frac = oasis_params.min_fraction_subjects if oasis_params else 0.01
-                    row['OASis_Identity'] = hum.get_oasis_identity(min_frac)
-                    row['OASis_Percentile'] = hum.get_oasis_percentile(min_frac)
-                    if hum.vh:
-                        row['Heavy_OASis_Identity'] = hum.vh.get_oasis_identity(min_frac)
-                        # row['Heavy_Germline'] = hum.vh.v_gene  # Not available in ChainHumanness
-                    if hum.vl:
-                        row['Light_OASis_Identity'] = hum.vl.get_oasis_identity(min_frac)
-                        # row['Light_Germline'] = hum.vl.v_gene  # Not available in ChainHumanness
-                
-                num_mutations = 0
-                if res['humanization'].vh:
-                    num_mutations += res['humanization'].vh.num_mutations()
-                if res['humanization'].vl:
-                    num_mutations += res['humanization'].vl.num_mutations()
-                row['Num_Mutations'] = num_mutations
-                
-                overview_data.append(row)
-            
-            sheets['Overview'] = pd.DataFrame(overview_data)
+                    scores = res['humanized_humanness'].get_oasis_summary(min_frac)
+                    oasis_identity[i] = scores.identity
+                    oasis_percentile[i] = scores.percentile
+                    if scores.vh_identity is not None:
+                        heavy_oasis_identity[i] = scores.vh_identity
+                    if scores.vl_identity is not None:
+                        light_oasis_identity[i] = scores.vl_identity
+
+            # Columns without any value (e.g. no light chains in input) are left out
+            sheets['Overview'] = pd.DataFrame({
+                'Antibody': [res['name'] for res in results],
+                'OASis_Identity': oasis_identity,
+                'OASis_Percentile': oasis_percentile,
+                'Heavy_OASis_Identity': heavy_oasis_identity,
+                'Light_OASis_Identity': light_oasis_identity,
+                'Num_Mutations': num_mutations
+            }).dropna(axis=1, how='all')
             
             # Write to Excel
-            write_sheets(sheets, xlsx_path)
+            write_sheets(sheets, xlsx_path, constant_memory=True)
         
         click.echo(f'Completed! Output saved to {output}', err=True)
     
-    click.echo(f'Successfully humanized {len(results)} {"antibody" if len(results) == 1 else "antibodies"}', err=True)
+    click.echo(f'Successfully humanized {num_results} {"antibody" if num_results == 1 else "antibodies"}', err=True)
+
+
+def _iterate_results(records, humanization_params, oasis_params=None, fasta_only=False, report=False, jobs=None):
+    """Humanize FASTA records in parallel, yield result dicts in input order (failed records are skipped)
+
+    With report=True, the results also include the number of mutations and the chain alignments.
+
+    Records are consumed lazily and submitted to the pool in batches, so the input is never fully loaded into memory.
+    A bounded number of batches is kept in flight and topped up as results are consumed, so all workers stay busy.
+    """
+    jobs = jobs or os.cpu_count()
+    make_chain = _get_chain_factory(humanization_params)
+    process = partial(_process_batch, humanization_params=humanization_params, oasis_params=oasis_params,
+                      make_chain=make_chain,
+                      method_desc=_get_method_description(humanization_params, fasta_only=fasta_only),
+                      fasta_only=fasta_only, report=report)
+    with Pool(jobs, initializer=_init_worker, initargs=(make_chain, oasis_params)) as pool, \
+            tqdm(desc='Humanizing', unit=' records', file=sys.stderr) as progress:
+        pending = deque()
+        batches = chunk_list(records, RECORDS_PER_JOB)
+        while True:
+            for batch in itertools.islice(batches, jobs * 2 - len(pending)):
+                pending.append(pool.apply_async(process, (batch,)))
+            if not pending:
+                break
+            batch_results = pending.popleft().get()
+            progress.update(len(batch_results))
+            for res in batch_results:
+                if res is not None:
+                    yield res
+
+
+def _get_chain_factory(humanization_params):
+    """Get function that creates a Chain from a sequence using the scheme and CDR definition of given params"""
+    return partial(Chain, scheme=humanization_params.scheme, cdr_definition=humanization_params.cdr_definition)
+
+
+def _init_worker(make_chain, oasis_params=None):
+    """Prepare worker process before it starts humanizing batches
+
+    Numbers a heavy and a light warm-up chain to load the numbering tools, searches their germlines to load the
+    heavy and light germline tables used for grafting, opens the OASis DB connection, which is then reused,
+    and caches the OASis subject counts.
+    """
+    for seq in WARMUP_SEQS:
+        try:
+            make_chain(seq).find_human_germlines(limit=1)
+        except Exception:
+            # Errors are reported when processing each record
+            pass
+
+    if not oasis_params or not oasis_params.oasis_db_path:
+        return
+    try:
+        engine = get_oasis_engine(oasis_params.oasis_db_path)
+        # Do not reuse connections inherited from the parent process
+        engine.dispose(close=False)
+        for filter_chain in ['Heavy', 'Light']:
+            get_num_total_oas_subjects(oasis_params.oasis_db_path, filter_chain)
+    except Exception:
+        # Errors are reported when computing OASis scores of each batch
+        pass
+
+
+def _process_batch(records, humanization_params, make_chain, method_desc, oasis_params=None, fasta_only=False,
+                   report=False):
+    """Humanize a batch of (id, sequence) FASTA records, return list of result dicts (None for records that could not be processed)
+
+    Runs in a worker process, so the results need to be picklable.
+    """
+    results = [_process_record(name, seq, humanization_params, make_chain, method_desc, fasta_only=fasta_only,
+                               report=report)
+               for name, seq in records]
+    valid_results = [res for res in results if res is not None]
+
+    # Get humanness scores if OASis DB is available
+    if oasis_params and valid_results:
+        try:
+            _add_oasis_humanness(valid_results, oasis_params=oasis_params)
+        except Exception:
+            # Evaluate records one by one so that only the failing ones are missing OASis scores
+            for res in valid_results:
+                try:
+                    _add_oasis_humanness([res], oasis_params=oasis_params)
+                except Exception as e:
+                    click.echo(f'Warning: Could not compute OASis scores for {res["name"]}: {e}', err=True)
+
+    return results
+
+
+def _add_oasis_humanness(results, oasis_params):
+    """Add parental and humanized OASis humanness to result dicts, searching the OASis DB once for all of them"""
+    antibodies = []
+    for res in results:
+        humanization = res['humanization']
+        antibodies.append((
+            humanization.vh.parental_chain if humanization.vh else None,
+            humanization.vl.parental_chain if humanization.vl else None
+        ))
+        antibodies.append((
+            humanization.vh.humanized_chain if humanization.vh else None,
+            humanization.vl.humanized_chain if humanization.vl else None
+        ))
+    humanness = get_antibody_humanness_batch(antibodies, params=oasis_params)
+    for res, parental_humanness, humanized_humanness in zip(results, humanness[::2], humanness[1::2]):
+        res['parental_humanness'] = parental_humanness
+        res['humanized_humanness'] = humanized_humanness
+
+
+def _process_record(name, seq, humanization_params, make_chain, method_desc, fasta_only=False, report=False):
+    """Humanize a single FASTA record given by its id and sequence, return result dict or None if it could not be processed"""
+    # Skip obvious non-antibody sequences before running the expensive numbering
+    if not looks_like_antibody_v_domain(seq):
+        click.echo(f'Warning: Skipping {name}, does not look like an antibody variable domain', err=True)
+        return None
+
+    try:
+        chain = make_chain(seq)
+        chain.name = name
+        result, _ = humanize_antibody_auto(chain, params=humanization_params)
+        # Aligning chains is costly, do it in the worker when writing a report (alignment is cached and sent back)
+        num_mutations = sum(
+            chain_result.num_mutations() for chain_result in [result.vh, result.vl] if chain_result
+        ) if report else None
+    except ChainParseError as e:
+        click.echo(f'Warning: Could not parse {name}: {e}', err=True)
+        return None
+    except Exception as e:
+        click.echo(f'Error processing {name}: {e}', err=True)
+        return None
+
+    humanized_records = _get_humanized_records(name, result, method_desc, fasta_only=fasta_only)
+    if fasta_only:
+        # Only the humanized sequences are needed, keep the result small to pickle
+        return {
+            'name': name,
+            'humanized_records': humanized_records
+        }
+
+    return {
+        'name': name,
+        'humanization': result,
+        'parental_humanness': None,
+        'humanized_humanness': None,
+        'num_mutations': num_mutations,
+        'humanized_records': humanized_records
+    }
+
+
+def _get_method_description(humanization_params, fasta_only=False) -> str:
+    """Get humanization method label used in FASTA descriptions of humanized chains"""
+    if not fasta_only:
+        return humanization_params.get_export_name()
+
+    return ''.join([
+        f'CDR_Grafted_{humanization_params.cdr_definition}_',
+        'Vernier_' if humanization_params.backmutate_vernier else '',
+        f'Sapiens_{humanization_params.sapiens_iterations}iter_' if humanization_params.sapiens_iterations > 0 else ''
+    ])
+
+
+def _get_humanized_records(name, humanization, method_desc, fasta_only=False) -> List[Tuple[str, str, str]]:
+    """Get (id, description, sequence) tuple for each humanized chain"""
+    records = []
+    for chain_result in [humanization.vh, humanization.vl]:
+        if not chain_result:
+            continue
+        humanized_chain = chain_result.humanized_chain
+        chain_type = 'VH' if humanized_chain.is_heavy_chain() else 'VL'
+
+        if fasta_only:
+            germline = humanized_chain.v_gene if hasattr(humanized_chain, 'v_gene') else 'auto'
+            records.append((
+                name,
+                f'{chain_type} (Humanized {name} {method_desc}{germline} BioPhi)',
+                humanized_chain.seq
+            ))
+        else:
+            records.append((
+                f'{name}_{chain_type}',
+                f'{name} {chain_type} (Humanized {name} {method_desc}BioPhi)',
+                humanized_chain.seq
+            ))
+    return records
+
+
+def _write_fasta(records: List[Tuple[str, str, str]], f) -> int:
+    """Write (id, description, sequence) tuples to FASTA file handle, return number of written records"""
+    for record_id, description, seq in records:
+        f.write(f'>{record_id} {description}\n')
+        for i in range(0, len(seq), FASTA_LINE_LENGTH):
+            f.write(seq[i:i + FASTA_LINE_LENGTH])
+            f.write('\n')
+    return len(records)
 
 
 def cdrgraft_interactive(humanization_params, oasis_params=None):
     """Interactive mode for single antibody humanization."""
-    click.echo('Interactive mode - Enter antibody sequences:', err=True)
-    click.echo('(Paste VH and/or VL sequences, press Enter twice when done)', err=True)
-    
-    sequences = []
-    while True:
-        try:
-            line = input()
-            if not line.strip():
-                if sequences:
-                    break
-                continue
-            sequences.append(line.strip())
-        except EOFError:
-            break
+    if not sys.stdin.isatty():
+        # Piped input, read everything at once
+        text = sys.stdin.read().strip()
+        if text.startswith('>'):
+            # FASTA records, possibly with sequences wrapped over multiple lines
+            sequences = [str(record.seq) for record in parse_plaintext_records(text)]
+        else:
+            # One sequence per line
+            sequences = [line.strip() for line in text.splitlines() if line.strip()]
+    else:
+        click.echo('Interactive mode - Enter antibody sequences:', err=True)
+        click.echo('(Paste VH and/or VL sequences, press Enter twice when done)', err=True)
+        sequences = []
+        while True:
+            try:
+                line = input()
+                if not line.strip():
+                    if sequences:
+                        break
+                    continue
+                sequences.append(line.strip())
+            except EOFError:
+                break
     
     if not sequences:
         click.echo('No sequences provided', err=True)
@@ -353,20 +487,26 @@ def cdrgraft_interactive(humanization_params, oasis_params=None):
     # Parse sequences
     vh_chain = None
     vl_chain = None
+    make_chain = _get_chain_factory(humanization_params)
     
     for seq in sequences:
         if seq.startswith('>'):
             continue
         try:
-            chain = Chain(seq, scheme=humanization_params.scheme, cdr_definition=humanization_params.cdr_definition)
-            if chain.is_heavy_chain():
-                vh_chain = chain
-                vh_chain.name = 'VH'
-            else:
-                vl_chain = chain
-                vl_chain.name = 'VL'
-        except ChainParseError:
+            chain = make_chain(seq)
+        except ChainParseError as e:
+            click.echo(f'Warning: Could not parse sequence {seq[:20]}...: {e}', err=True)
             continue
+        if chain.is_heavy_chain():
+            if vh_chain:
+                click.echo('Warning: Multiple heavy chains provided, using the last one', err=True)
+            vh_chain = chain
+            vh_chain.name = 'VH'
+        else:
+            if vl_chain:
+                click.echo('Warning: Multiple light chains provided, using the last one', err=True)
+            vl_chain = chain
+            vl_chain.name = 'VL'
     
     if not vh_chain and not vl_chain:
         click.echo('Could not parse any valid antibody sequences', err=True)
@@ -1,5 +1,5 @@
 from functools import cached_property
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import requests
 from dataclasses import dataclass
@@ -162,6 +162,19 @@ def humanize_antibody(vh: Optional[Chain], vl: Optional[Chain], params: Humaniza
     )
 
 
+def humanize_antibody_auto(chain: Chain, params: HumanizationParams) -> Tuple[AntibodyHumanization, bool]:
+    """Humanize single chain as the heavy or light chain of an antibody based on its chain type
+
+    Returns the antibody humanization and True if the chain is a heavy chain
+    """
+    is_heavy = chain.chain_type == 'H'
+    humanization = humanize_chain(chain, params=params)
+    return AntibodyHumanization(
+        vh=humanization if is_heavy else None,
+        vl=None if is_heavy else humanization
+    ), is_heavy
+
+
 def humanize_chain(parental_chain: Chain, params: HumanizationParams) -> ChainHumanization:
     assert parental_chain.cdr_definition == params.cdr_definition, \
         f'Expected chain with {params.cdr_definition} CDR definition, got {parental_chain.cdr_definition}'
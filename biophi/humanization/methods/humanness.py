@@ -8,6 +8,7 @@ import pandas as pd
 from abnumber.germlines import get_imgt_v_chains, get_imgt_j_chains
 from sqlalchemy import create_engine, text
 from typing import Dict, Union, List, Optional, Tuple
+from urllib.request import pathname2url
 import numpy as np
 from sqlalchemy.engine import Engine
 from biophi.humanization.methods.stats import get_oasis_percentile, \
@@ -20,6 +21,9 @@ OASIS_MIN_SUBJECTS_THRESHOLDS = {
     'strict': 0.9
 }
 
+# Maximum number of peptides searched in a single query (SQLite limit of bound parameters)
+OASIS_MAX_QUERY_PEPTIDES = 999
+
 @dataclass
 class OASisParams:
     oasis_db_path: str
@@ -73,6 +77,12 @@ class ChainHumanness:
     def pos_imgt_mapping(self) -> Dict[Position, Position]:
         return {pos: imgt_pos for pos, imgt_pos in zip(self.chain.positions, self.imgt_chain.positions)}
 
+    @cached_property
+    def peptide_fractions_oas_subjects(self) -> np.ndarray:
+        """Array with fraction of OAS subjects of each peptide (NaN if not evaluated using the OASis DB)"""
+        return np.array([np.nan if p.fraction_oas_subjects is None else p.fraction_oas_subjects
+                         for p in self.peptides.values()], dtype=float)
+
     def get_oasis_curve(self, frequency=True, cumulative=True) -> pd.Series:
         bins = [get_fraction_subjects_bin(peptide.fraction_oas_subjects) for peptide in self.peptides.values()]
         curve = pd.Series(bins, name=self.chain.name).value_counts().reindex(FRACTION_SUBJECTS_BINS).fillna(0)
@@ -105,7 +115,11 @@ class ChainHumanness:
         return [germlines[name] for name in self.j_germline_names[:limit]]
 
     def get_num_human_peptides(self, min_fraction_subjects) -> int:
-        return sum(p.is_human(min_fraction_subjects) for p in self.peptides.values())
+        assert 0 < min_fraction_subjects < 1, 'min_fraction_subjects should be between 0 and 1'
+        fractions = self.peptide_fractions_oas_subjects
+        if np.isnan(fractions).any():
+            return np.nan
+        return int(np.count_nonzero(fractions >= min_fraction_subjects))
 
     def get_num_nonhuman_peptides(self, max_fraction_subjects) -> int:
         return sum(not p.is_human(max_fraction_subjects) for p in self.peptides.values())
@@ -195,6 +209,14 @@ class ChainHumanness:
         return top_freqs
 
 
+@dataclass
+class OASisSummary:
+    identity: float
+    percentile: float
+    vh_identity: Optional[float]
+    vl_identity: Optional[float]
+
+
 @dataclass
 class AntibodyHumanness:
     vh: ChainHumanness
@@ -210,6 +232,24 @@ class AntibodyHumanness:
             min_fraction_subjects=min_fraction_subjects
         )
 
+    def get_oasis_summary(self, min_fraction_subjects) -> OASisSummary:
+        """Get antibody and chain OASis scores, counting human peptides of each chain only once"""
+        vh_num_human = self.vh.get_num_human_peptides(min_fraction_subjects) if self.vh else 0
+        vl_num_human = self.vl.get_num_human_peptides(min_fraction_subjects) if self.vl else 0
+        vh_num_peptides = self.vh.get_num_peptides() if self.vh else 0
+        vl_num_peptides = self.vl.get_num_peptides() if self.vl else 0
+        identity = (vh_num_human + vl_num_human) / (vh_num_peptides + vl_num_peptides)
+        return OASisSummary(
+            identity=identity,
+            percentile=get_oasis_percentile(
+                chain_type='mean',
+                oasis_identity=identity,
+                min_fraction_subjects=min_fraction_subjects
+            ),
+            vh_identity=vh_num_human / vh_num_peptides if self.vh else None,
+            vl_identity=vl_num_human / vl_num_peptides if self.vl else None
+        )
+
     def get_oasis_curve(self, frequency=True) -> pd.Series:
         if self.vh and self.vl:
             counts_curve = self.vh.get_oasis_curve(frequency=False, cumulative=False) \
@@ -271,58 +311,100 @@ def chop_seq_peptides(seq: Union[SeqRecord, Chain], peptide_length):
 
 
 def get_antibody_humanness(vh: Optional[Chain], vl: Optional[Chain], params: OASisParams) -> AntibodyHumanness:
-    return AntibodyHumanness(
-        vh=get_chain_humanness(vh, params=params) if vh else None,
-        vl=get_chain_humanness(vl, params=params) if vl else None
-    )
+    return get_antibody_humanness_batch([(vh, vl)], params=params)[0]
+
+
+def get_antibody_humanness_batch(antibodies: List[Tuple[Optional[Chain], Optional[Chain]]],
+                                 params: OASisParams) -> List[AntibodyHumanness]:
+    """Get humanness of multiple (VH, VL) antibodies, searching the OASis DB for peptides of all chains at once"""
+    chains = [chain for vh, vl in antibodies for chain in [vh, vl] if chain]
+    chains_peptides = get_chains_oasis_peptides(chains, params=params)
+    humanness = {
+        id(chain): get_chain_humanness(chain, params=params, peptides=peptides)
+        for chain, peptides in zip(chains, chains_peptides)
+    }
+    return [AntibodyHumanness(
+        vh=humanness[id(vh)] if vh else None,
+        vl=humanness[id(vl)] if vl else None
+    ) for vh, vl in antibodies]
 
 
 def get_chain_oasis_peptides(chain, params: OASisParams):
-    pos_peptides = chop_seq_peptides(chain, peptide_length=9)
+    return get_chains_oasis_peptides([chain], params=params)[0]
+
+
+def get_chains_oasis_peptides(chains: List[Chain], params: OASisParams) -> List[Dict[Position, PeptideHumanness]]:
+    chains_pos_peptides = [chop_seq_peptides(chain, peptide_length=9) for chain in chains]
 
     if params.oasis_db_path is None:
-        return {pos: PeptideHumanness(
+        return [{pos: PeptideHumanness(
                     seq=peptide,
                     num_oas_subjects=None,
                     fraction_oas_subjects=None,
                     num_oas_occurrences=None
-                ) for pos, peptide in pos_peptides}
-
-    if params.oasis_db_path.endswith('.gz'):
+                ) for pos, peptide in pos_peptides} for pos_peptides in chains_pos_peptides]
+
+    chains_peptides = [None] * len(chains)
+    with get_oasis_engine(params.oasis_db_path).connect() as oas_engine:
+        for oas_filter_chain in ['Heavy', 'Light']:
+            chain_idx = [i for i, chain in enumerate(chains)
+                         if ("Heavy" if chain.is_heavy_chain() else "Light") == oas_filter_chain]
+            if not chain_idx:
+                continue
+
+            num_total_oas_subjects = get_num_total_oas_subjects(params.oasis_db_path, oas_filter_chain)
+
+            # Search each unique peptide only once, in chunks that fit into a single query
+            peptides = sorted({peptide for i in chain_idx for pos, peptide in chains_pos_peptides[i]})
+            oas_hits = pd.concat([get_oas_hits(
+                peptides[start:start + OASIS_MAX_QUERY_PEPTIDES],
+                engine=oas_engine,
+                filter_chain=oas_filter_chain
+            ) for start in range(0, len(peptides), OASIS_MAX_QUERY_PEPTIDES)], ignore_index=True)
+            oas_grouped = oas_hits.groupby('peptide')
+
+            for i in chain_idx:
+                chains_peptides[i] = {
+                    pos: parse_peptide_humanness(
+                        pep,
+                        oas_hits=oas_grouped.get_group(pep) if pep in oas_grouped.groups else oas_hits[:0],
+                        num_total_oas_subjects=num_total_oas_subjects
+                    ) for pos, pep in chains_pos_peptides[i]
+                }
+
+    return chains_peptides
+
+
+@lru_cache(maxsize=None)
+def get_oasis_engine(oasis_db_path: str) -> Engine:
+    """Get read-only OASis DB engine, created only once per process so that pooled connections are reused"""
+    if oasis_db_path.endswith('.gz'):
         raise ValueError('The OASis DB file needs to be unzipped (use "gunzip DB_PATH.db.gz")')
 
-    if not os.path.exists(params.oasis_db_path):
-        raise FileNotFoundError(f'The OASis DB path does not exist: {params.oasis_db_path}')
+    if not os.path.exists(oasis_db_path):
+        raise FileNotFoundError(f'The OASis DB path does not exist: {oasis_db_path}')
 
-    oas_engine = create_engine('sqlite:///' + os.path.abspath(params.oasis_db_path), echo=False).connect()
+    # Percent-encode the path so that characters like # or % are not interpreted as part of the URI
+    return create_engine(f'sqlite:///file:{pathname2url(os.path.abspath(oasis_db_path))}?mode=ro&uri=true', echo=False)
 
-    oas_filter_chain = "Heavy" if chain.is_heavy_chain() else "Light"
-    result = oas_engine.execute(text(f'SELECT COUNT(*) FROM subjects WHERE Complete{oas_filter_chain}Seqs >= 10000'))
-    num_total_oas_subjects = int(result.fetchall()[0][0])
 
-    oas_hits = get_oas_hits(
-        [peptide for pos, peptide in pos_peptides],
-        engine=oas_engine,
-        filter_chain=oas_filter_chain
-    )
-    oas_grouped = oas_hits.groupby('peptide')
-
-    return {
-        pos: parse_peptide_humanness(
-            pep,
-            oas_hits=oas_grouped.get_group(pep) if pep in oas_grouped.groups else oas_hits[:0],
-            num_total_oas_subjects=num_total_oas_subjects
-        ) for pos, pep in pos_peptides
-    }
+@lru_cache(maxsize=None)
+def get_num_total_oas_subjects(oasis_db_path: str, filter_chain: str) -> int:
+    """Get number of OAS subjects with enough Heavy or Light chain sequences, queried only once per process"""
+    with get_oasis_engine(oasis_db_path).connect() as oas_engine:
+        result = oas_engine.execute(text(f'SELECT COUNT(*) FROM subjects WHERE Complete{filter_chain}Seqs >= 10000'))
+        return int(result.fetchall()[0][0])
 
 
-def get_chain_humanness(chain: Chain, params: OASisParams) -> ChainHumanness:
+def get_chain_humanness(chain: Chain, params: OASisParams, peptides: Dict[Position, PeptideHumanness] = None) -> ChainHumanness:
 
-    peptides = get_chain_oasis_peptides(chain, params=params)
+    if peptides is None:
+        peptides = get_chain_oasis_peptides(chain, params=params)
 
     imgt_chain = chain if chain.scheme == 'imgt' and chain.cdr_definition == 'imgt' else chain.renumber('imgt')
 
-    v_germline_chains, j_germline_chains = chain.find_human_germlines(limit=10)
+    # Search germlines using the IMGT chain, which is what find_human_germlines would renumber the chain to again
+    v_germline_chains, j_germline_chains = imgt_chain.find_human_germlines(limit=10)
     top_v, top_j = v_germline_chains[0], j_germline_chains[0]
     num_germline_residues = sum(top_v.positions.get(pos) == aa or top_j.positions.get(pos) == aa
                                     for pos, aa in imgt_chain)
@@ -0,0 +1,89 @@
+import sqlite3
+import pytest
+from abnumber import Chain
+from biophi.humanization.methods import humanness
+from biophi.humanization.methods.humanness import OASisParams, get_chains_oasis_peptides, get_chain_oasis_peptides
+
+VH = 'QVQLVQSGVEVKKPGASVKVSCKASGYTFTNYYMYWVRQAPGQGLEWMGGINPSNGGTNFNEKFKNRVTLTTDSSTTTAYMELKSLQFDDTAVYYCARRDYRFDMGFDYWGQGTTVTVSS'
+VH_MUTATED = VH.replace('GINPSNGGTN', 'GINPSDGGTN')
+VL = 'DIQMTQSPSSLSASVGDRVTITCRASQSISSYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGSGSGTDFTLTISSLQPEDFATYYCQQSYSTPLTFGQGTKVEIK'
+
+
+def chop_peptides(seq):
+    return [seq[i:i + 9] for i in range(len(seq) - 8)]
+
+
+# Peptides are searched in sorted order, so these are always found in the last query
+LAST_HEAVY_PEPTIDE = max(chop_peptides(VH) + chop_peptides(VH_MUTATED))
+LAST_LIGHT_PEPTIDE = max(chop_peptides(VL))
+
+# (id, StudyPath, CompleteHeavySeqs, CompleteLightSeqs)
+SUBJECTS = [
+    (1, 'Study_A', 20000, 20000),
+    (2, 'Study_A', 20000, 0),
+    (3, 'Study_B', 0, 20000),
+    (4, 'Corcoran_2016', 20000, 20000),
+    (5, 'Study_B', 500, 500),
+]
+# (peptide, subject, count)
+PEPTIDES = [
+    (VH[:9], 1, 5),
+    (VH[:9], 2, 1),
+    (VH[:9], 3, 7),
+    (VH[:9], 4, 2),
+    (VH[:9], 5, 3),
+    (VH[48:57], 2, 4),
+    (VH_MUTATED[48:57], 1, 2),
+    (VL[:9], 1, 1),
+    (VL[:9], 3, 6),
+    (VL[:9], 2, 9),
+    (LAST_HEAVY_PEPTIDE, 2, 3),
+    (LAST_LIGHT_PEPTIDE, 3, 2),
+    ('AAAAAAAAA', 1, 1),
+]
+
+
+def get_expected_humanness(peptide, chain_type):
+    column = 2 if chain_type == 'Heavy' else 3
+    subjects = {subject[0]: subject for subject in SUBJECTS}
+    num_total_subjects = sum(subject[column] >= 10000 for subject in SUBJECTS)
+    counts = [count for pep, subject, count in PEPTIDES
+              if pep == peptide and subjects[subject][1] != 'Corcoran_2016' and subjects[subject][column] >= 10000]
+    return len(counts), len(counts) / num_total_subjects, sum(counts)
+
+
+@pytest.fixture
+def oasis_params(tmp_path):
+    path = tmp_path / 'oasis.db'
+    with sqlite3.connect(path) as connection:
+        connection.execute('CREATE TABLE subjects (id INTEGER, StudyPath TEXT, CompleteHeavySeqs INTEGER, CompleteLightSeqs INTEGER)')
+        connection.execute('CREATE TABLE peptides (peptide TEXT, subject INTEGER, count INTEGER)')
+        connection.executemany('INSERT INTO subjects VALUES (?, ?, ?, ?)', SUBJECTS)
+        connection.executemany('INSERT INTO peptides VALUES (?, ?, ?)', PEPTIDES)
+    return OASisParams(oasis_db_path=str(path), min_fraction_subjects=0.10)
+
+
+def test_get_chains_oasis_peptides(oasis_params, monkeypatch):
+    # Split the peptide search into multiple queries
+    monkeypatch.setattr(humanness, 'OASIS_MAX_QUERY_PEPTIDES', 7)
+
+    chains = [Chain(seq, scheme='imgt') for seq in [VH, VL, VH_MUTATED]]
+    chain_types = ['Heavy', 'Light', 'Heavy']
+    chains_peptides = get_chains_oasis_peptides(chains, params=oasis_params)
+
+    assert len(chains_peptides) == len(chains)
+    for chain, chain_type, peptides in zip(chains, chain_types, chains_peptides):
+        assert peptides == get_chain_oasis_peptides(chain, params=oasis_params), 'Batch should match single chain search'
+        assert len(peptides) == len(chain) - 8
+        for peptide in peptides.values():
+            num_subjects, fraction_subjects, num_occurrences = get_expected_humanness(peptide.seq, chain_type)
+            assert peptide.num_oas_subjects == num_subjects, peptide.seq
+            assert peptide.fraction_oas_subjects == pytest.approx(fraction_subjects), peptide.seq
+            assert peptide.num_oas_occurrences == num_occurrences, peptide.seq
+
+    vh_peptides, vl_peptides, vh_mutated_peptides = [list(peptides.values()) for peptides in chains_peptides]
+    assert vh_peptides[0].num_oas_subjects == vh_mutated_peptides[0].num_oas_subjects == 2
+    assert vl_peptides[0].num_oas_subjects == 2
+    assert vh_peptides[48].num_oas_subjects == 1 and vh_mutated_peptides[48].num_oas_subjects == 1
+    assert [p.num_oas_subjects for p in vh_peptides if p.seq == LAST_HEAVY_PEPTIDE] == [1]
+    assert [p.num_oas_subjects for p in vl_peptides if p.seq == LAST_LIGHT_PEPTIDE] == [1]
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from biophi.common.utils.io import write_sheets
+
+
+def test_write_sheets_constant_memory(tmp_path):
+    multiindex = pd.DataFrame(
+        [[1, 2.5, 'a'], [3, np.nan, 'b']],
+        columns=pd.MultiIndex.from_tuples([('Group', 'x'), ('Group', 'y'), ('Other', 'z')])
+    )
+    indexed = pd.DataFrame({'Score': [0.1, np.nan, 0.3], 'Name': ['a', None, 'c']},
+                           index=pd.Index(['ab1', 'ab2', 'ab3'], name='Antibody'))
+    sheets = {'MultiIndex': multiindex, 'Indexed': indexed}
+
+    default_path = tmp_path / 'default.xlsx'
+    constant_memory_path = tmp_path / 'constant_memory.xlsx'
+    write_sheets(sheets, str(default_path))
+    write_sheets(sheets, str(constant_memory_path), constant_memory=True)
+
+    for sheet_name in sheets:
+        expected = pd.read_excel(default_path, sheet_name=sheet_name, header=None)
+        actual = pd.read_excel(constant_memory_path, sheet_name=sheet_name, header=None)
+        pd.testing.assert_frame_equal(actual, expected)
+
+    indexed_cells = pd.read_excel(constant_memory_path, sheet_name='Indexed', header=None)
+    assert indexed_cells.iloc[0].tolist() == ['Antibody', 'Score', 'Name']
+    assert indexed_cells.iloc[1].tolist() == ['ab1', 0.1, 'a']
+    assert indexed_cells.iloc[2, 0] == 'ab2' and indexed_cells.iloc[2, 1:].isna().all()
@@ -0,0 +1,22 @@
+from biophi.common.utils.seq import looks_like_antibody_v_domain, iterate_fasta_tuples, iterate_fasta
+
+
+def test_looks_like_antibody_v_domain():
+    vh = 'QVQLVQSGVEVKKPGASVKVSCKASGYTFTNYYMYWVRQAPGQGLEWMGGINPSNGGTNFNEKFKNRVTLTTDSSTTTAYMELKSLQFDDTAVYYCARRDYRFDMGFDYWGQGTTVTVSS'
+    vl = 'DIQMTQSPSSLSASVGDRVTITCRASQSISSYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGSGSGTDFTLTISSLQPEDFATYYCQQSYSTPLTFGQGTKVEIK'
+    assert looks_like_antibody_v_domain(vh)
+    assert looks_like_antibody_v_domain(vl)
+    assert looks_like_antibody_v_domain(vh.lower()), 'Lowercase sequence should be accepted'
+    assert looks_like_antibody_v_domain(vh + 'ASTKGPSVFPLAPSSKSTSGGTAALGCLVKDYFPEPVTVSWNSGALTSGVHTFPAVLQSSGLYSLSSVVTVPSSSLGTQTYICNVNHKPSNTKVDKKV'), \
+        'Sequence with constant region should be accepted'
+
+    assert not looks_like_antibody_v_domain(vh[:60]), 'Short fragment should be rejected'
+    assert not looks_like_antibody_v_domain('ACGT' * 100), 'Nucleotide sequence should be rejected'
+    assert not looks_like_antibody_v_domain(vh.replace('C', 'S')), 'Sequence without conserved cysteines should be rejected'
+
+
+def test_iterate_fasta_tuples(tmp_path):
+    path = tmp_path / 'input.fa'
+    path.write_text('>seq1 Some description\nEVQLV\nESGGG\n>seq2\nDIQMT\n')
+    expected = [(record.id, str(record.seq)) for record in iterate_fasta(str(path))]
+    assert list(iterate_fasta_tuples(str(path))) == expected == [('seq1', 'EVQLVESGGG'), ('seq2', 'DIQMT')]